@@ -0,0 +1,151 @@
+"""Measures export throughput (rows/sec) on synthetic sessions.
+
+Runs entirely in memory, so the numbers cover row building and encoding
+only, not MongoDB reads. Usage: python bench_export.py [sessions]
+"""
+import asyncio
+import csv
+import gc
+import io
+import sys
+import time
+from datetime import datetime, timedelta
+
+import exports
+
+PLAYERS = 30
+QUESTIONS = 20
+REPEATS = 5  # Best of N, to smooth out noise
+
+def make_session(n):
+    started = datetime(2024, 1, 1) + timedelta(hours=n)
+    session = {
+        "room_id": f"{n:06d}",
+        "created_at": started,
+        "quiz_data": {
+            "id": "bench",
+            "questions": [
+                {"title": f"Question {q}", "options": ["A", "B", "C", "D"], "correctOption": q % 4, "timeLimit": 20}
+                for q in range(QUESTIONS)
+            ],
+        },
+        "players": [{"sid": f"sid{p}", "name": f"Player {p}"} for p in range(PLAYERS)],
+        "question_start_times": {str(q): started + timedelta(minutes=q) for q in range(QUESTIONS)},
+    }
+    responses = [
+        {
+            "room_id": session["room_id"],
+            "sid": f"sid{p}",
+            "question_index": q,
+            "answer_index": p % 4,
+            "is_correct": p % 4 == q % 4,
+            "score_awarded": 1000 if p % 4 == q % 4 else 0,
+            "timestamp": started + timedelta(minutes=q, seconds=p % 20),
+        }
+        for q in range(QUESTIONS)
+        for p in range(PLAYERS)
+    ]
+    return session, responses
+
+async def _batches(data):
+    # Same grouping as exports.iter_result_batches
+    size = exports.EXPORT_SESSION_BATCH_SIZE
+    for i in range(0, len(data), size):
+        columns = exports.new_result_columns()
+        for session, responses in data[i:i + size]:
+            exports.append_result_columns(columns, session, responses)
+        yield columns
+
+async def _drain(stream):
+    size = 0
+    async for chunk in stream:
+        size += len(chunk)
+    return size
+
+def baseline_csv(session, responses):
+    """The per-row CSV loop /export/{room_id} used before exports.py, kept for comparison."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(exports.CSV_HEADER)
+
+    quiz_data = session.get("quiz_data", {})
+    questions = quiz_data.get("questions", [])
+    players = {p["sid"]: p for p in session.get("players", [])}
+    start_times = session.get("question_start_times", {})
+
+    for r in responses:
+        sid = r.get("sid")
+        player = players.get(sid, {"name": "Unknown"})
+        q_idx = r.get("question_index")
+        a_idx = r.get("answer_index")
+
+        question = questions[q_idx] if q_idx < len(questions) else {}
+        q_title = question.get("title", "")
+        options = question.get("options", [])
+        correct_opt = question.get("correctOption")
+
+        answer_text = options[a_idx] if a_idx < len(options) else str(a_idx)
+        correct_text = options[correct_opt] if correct_opt < len(options) else str(correct_opt)
+
+        time_taken = "N/A"
+        start_time = start_times.get(str(q_idx))
+        if start_time and isinstance(start_time, str):
+            try:
+                start_time = datetime.fromisoformat(start_time)
+            except:
+                pass
+
+        if start_time and r.get("timestamp"):
+            try:
+                t1 = r.get("timestamp")
+                if t1.tzinfo is None and start_time.tzinfo is not None:
+                    t1 = t1.replace(tzinfo=start_time.tzinfo)
+                delta = t1 - start_time
+                time_taken = round(delta.total_seconds(), 2)
+            except Exception as e:
+                print(f"Error calculating time: {e}")
+
+        writer.writerow([
+            player.get("name"),
+            q_idx + 1,
+            q_title,
+            answer_text,
+            correct_text,
+            "Yes" if r.get("is_correct") else "No",
+            time_taken,
+            r.get("score_awarded", 0)
+        ])
+    return output.getvalue()
+
+def bench_baseline_csv(data):
+    return sum(len(baseline_csv(s, r)) for s, r in data)
+
+def bench_csv(data):
+    # Current /export/{room_id}: one CSV document per room
+    return sum(len(exports.columns_to_csv(exports.build_result_columns(s, r))) for s, r in data)
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    data = [make_session(n) for n in range(sessions)]
+    gc.collect()
+    gc.freeze()  # Keep GC passes over the synthetic input out of the timings
+    total_rows = sessions * PLAYERS * QUESTIONS
+
+    runs = [("csv baseline", lambda: bench_baseline_csv(data)),
+            ("csv", lambda: bench_csv(data)),
+            ("ndjson", lambda: asyncio.run(_drain(exports.stream_ndjson(_batches(data)))))]
+    if exports.columnar_available():
+        runs += [("parquet", lambda: asyncio.run(_drain(exports.stream_parquet(_batches(data))))),
+                 ("arrow", lambda: asyncio.run(_drain(exports.stream_arrow(_batches(data)))))]
+
+    print(f"{total_rows} rows across {sessions} sessions")
+    for name, run in runs:
+        elapsed = float("inf")
+        for _ in range(REPEATS):
+            t0 = time.perf_counter()
+            size = run()
+            elapsed = min(elapsed, time.perf_counter() - t0)
+        print(f"{name:16} {total_rows / elapsed:>12,.0f} rows/sec  {size / 1e6:8.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import motor.motor_asyncio
 from pymongo import MongoClient
 import os
+import json
+import hashlib
 from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -44,26 +48,107 @@ async def add_player_to_session(room_id, player_data):
         {"$push": {"players": player_data}}
     )
 
+# Precomputed HTTP fields stored alongside each quiz, hidden from quiz documents
+QUIZ_CACHE_FIELDS = {"etag": 0, "serialized": 0}
+
+def _serialize_quiz(quiz: dict):
+    """Returns the JSON body served for a quiz and its content-hash ETag."""
+    public = {k: v for k, v in quiz.items() if k not in QUIZ_CACHE_FIELDS and k != "_id"}
+    public["id"] = str(quiz["_id"])
+    serialized = json.dumps(public, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v),
+                            ensure_ascii=False, separators=(",", ":"))
+    etag = '"' + hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:32] + '"'
+    return etag, serialized
+
+def _prepare_quiz(quiz_data: dict, created_at: datetime):
+    """Assigns the id up front so the served body and ETag can be stored with the quiz."""
+    quiz_data["_id"] = ObjectId()
+    quiz_data["created_at"] = created_at
+    quiz_data["etag"], quiz_data["serialized"] = _serialize_quiz(quiz_data)
+    return quiz_data
+
+async def _backfill_quiz_cache(quiz_id):
+    """Computes the cache fields for quizzes created before they existed."""
+    quiz = await quizzes_collection.find_one({"_id": quiz_id}, QUIZ_CACHE_FIELDS)
+    if not quiz:
+        return None, None
+    etag, serialized = _serialize_quiz(quiz)
+    await quizzes_collection.update_one({"_id": quiz_id}, {"$set": {"etag": etag, "serialized": serialized}})
+    return etag, serialized
+
 async def create_quiz(quiz_data: dict):
     """Creates a new quiz."""
-    quiz_data["created_at"] = datetime.utcnow()
+    _prepare_quiz(quiz_data, datetime.utcnow())
     result = await quizzes_collection.insert_one(quiz_data)
     return str(result.inserted_id)
 
-async def get_quizzes():
-    """Returns a list of all quizzes."""
-    quizzes = []
-    async for quiz in quizzes_collection.find():
-        quiz["id"] = str(quiz["_id"])
-        del quiz["_id"]
-        quizzes.append(quiz)
-    return quizzes
+async def create_quizzes(quiz_docs: list):
+    """Inserts a batch of quizzes unordered so one bad document doesn't stop the rest.
+
+    Returns the number inserted and a {position in quiz_docs: error message} dict.
+    """
+    from pymongo.errors import BulkWriteError
+    now = datetime.utcnow()
+    for quiz_data in quiz_docs:
+        _prepare_quiz(quiz_data, now)
+    try:
+        result = await quizzes_collection.insert_many(quiz_docs, ordered=False)
+        return len(result.inserted_ids), {}
+    except BulkWriteError as e:
+        errors = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+        return e.details.get("nInserted", 0), errors
+
+async def get_quiz_etags():
+    """Returns the ETags of all quizzes, in the same order as get_quiz_bodies."""
+    etags = []
+    async for quiz in quizzes_collection.find({}, {"etag": 1}).sort("_id", 1):
+        etag = quiz.get("etag")
+        if etag is None:
+            etag, _ = await _backfill_quiz_cache(quiz["_id"])
+        etags.append(etag)
+    return etags
+
+async def get_quiz_bodies():
+    """Returns (etag, serialized JSON) for all quizzes, in the same order as get_quiz_etags."""
+    bodies = []
+    async for quiz in quizzes_collection.find({}, {"etag": 1, "serialized": 1}).sort("_id", 1):
+        if quiz.get("etag") is None or quiz.get("serialized") is None:
+            bodies.append(await _backfill_quiz_cache(quiz["_id"]))
+        else:
+            bodies.append((quiz["etag"], quiz["serialized"]))
+    return bodies
+
+async def get_quiz_etag(quiz_id: str):
+    """Returns a quiz's ETag without loading its body, or None if not found."""
+    try:
+        oid = ObjectId(quiz_id)
+    except InvalidId:
+        return None
+    quiz = await quizzes_collection.find_one({"_id": oid}, {"etag": 1})
+    if not quiz:
+        return None
+    if quiz.get("etag") is None:
+        etag, _ = await _backfill_quiz_cache(oid)
+        return etag
+    return quiz["etag"]
+
+async def get_quiz_body(quiz_id: str):
+    """Returns (etag, serialized JSON) for a quiz, or (None, None) if not found."""
+    try:
+        oid = ObjectId(quiz_id)
+    except InvalidId:
+        return None, None
+    quiz = await quizzes_collection.find_one({"_id": oid}, {"etag": 1, "serialized": 1})
+    if not quiz:
+        return None, None
+    if quiz.get("etag") is None or quiz.get("serialized") is None:
+        return await _backfill_quiz_cache(oid)
+    return quiz["etag"], quiz["serialized"]
 
 async def get_quiz(quiz_id: str):
     """Returns a single quiz by ID."""
-    from bson import ObjectId
     try:
-        quiz = await quizzes_collection.find_one({"_id": ObjectId(quiz_id)})
+        quiz = await quizzes_collection.find_one({"_id": ObjectId(quiz_id)}, QUIZ_CACHE_FIELDS)
         if quiz:
             quiz["id"] = str(quiz["_id"])
             del quiz["_id"]
@@ -85,6 +170,26 @@ async def get_room_responses(room_id):
         responses.append(r)
     return responses
 
+async def get_responses_for_rooms(room_ids):
+    """Retrieves responses for several rooms in one query, grouped by room_id."""
+    grouped = {room_id: [] for room_id in room_ids}
+    async for r in responses_collection.find({"room_id": {"$in": list(room_ids)}}):
+        grouped.setdefault(r["room_id"], []).append(r)
+    return grouped
+
+def find_sessions(quiz_id=None, start=None, end=None, batch_size=100):
+    """Returns a cursor over sessions filtered by quiz ID and/or creation date range."""
+    query = {}
+    if quiz_id:
+        query["quiz_data.id"] = quiz_id
+    if start or end:
+        query["created_at"] = {}
+        if start:
+            query["created_at"]["$gte"] = start
+        if end:
+            query["created_at"]["$lt"] = end
+    return sessions_collection.find(query).sort("created_at", 1).batch_size(batch_size)
+
 async def update_session_status(room_id, status):
     """Updates the status of the session (e.g., STARTED, FINISHED)."""
     await sessions_collection.update_one(
@@ -113,6 +218,12 @@ async def connect_to_mongodb():
         print(f"Failed to connect to MongoDB: {e}")
         return False
 
+async def ensure_indexes():
+    """Creates the indexes used by bulk exports (no-op when they already exist)."""
+    await sessions_collection.create_index("created_at")
+    await sessions_collection.create_index([("quiz_data.id", 1), ("created_at", 1)])
+    await responses_collection.create_index("room_id")
+
 async def close_mongodb_connection():
     """Close MongoDB connection"""
     motor_client.close()
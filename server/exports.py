@@ -0,0 +1,277 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Columnar formats are optional, see requirements.txt
+    pa = None
+    pq = None
+
+from database import find_sessions, get_responses_for_rooms
+
+# Columns shared by every export format, in output order
+EXPORT_COLUMNS = [
+    "room_id",
+    "quiz_id",
+    "session_created_at",
+    "player_name",
+    "question_index",
+    "question_title",
+    "answer_selected",
+    "correct_answer",
+    "is_correct",
+    "time_taken",
+    "score_awarded",
+]
+
+CSV_HEADER = ["Player Name", "Question Index", "Question Title", "Answer Selected", "Correct Answer", "Is Correct", "Time Taken (s)", "Score Awarded"]
+
+# Sessions whose responses are fetched (and encoded) together
+EXPORT_SESSION_BATCH_SIZE = 100
+
+BULK_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+def _parse_start_time(start_time):
+    """Start times may come back as datetimes or ISO strings (from JSON serialization)."""
+    if start_time and isinstance(start_time, str):
+        try:
+            start_time = datetime.fromisoformat(start_time)
+        except ValueError:
+            return None
+    return start_time or None
+
+def _option_text(options, index):
+    if isinstance(index, int) and 0 <= index < len(options):
+        return options[index]
+    return str(index)
+
+def new_result_columns():
+    return {name: [] for name in EXPORT_COLUMNS}
+
+def append_result_columns(columns, session, responses):
+    """Appends one denormalized result per response to the column lists.
+
+    Session values (room, quiz, ISO creation time) and per-question values
+    (title, options, correct answer, start time) are resolved once, so the
+    per-response work is only the lookups that vary by row.
+    """
+    quiz_data = session.get("quiz_data", {})
+    players = {p["sid"]: p.get("name") for p in session.get("players", [])}
+    start_times = session.get("question_start_times", {})
+    created_at = session.get("created_at")
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+
+    questions = []
+    for q_idx, question in enumerate(quiz_data.get("questions", [])):
+        options = question.get("options", [])
+        questions.append((
+            question.get("title", ""),
+            options,
+            _option_text(options, question.get("correctOption")),
+            _parse_start_time(start_times.get(str(q_idx))),
+        ))
+    no_question = ("", [], "None", None)
+
+    count = len(responses)
+    columns["room_id"].extend([session.get("room_id")] * count)
+    columns["quiz_id"].extend([quiz_data.get("id")] * count)
+    columns["session_created_at"].extend([created_at] * count)
+
+    player_names = columns["player_name"].append
+    question_indexes = columns["question_index"].append
+    question_titles = columns["question_title"].append
+    answers = columns["answer_selected"].append
+    correct_answers = columns["correct_answer"].append
+    is_correct = columns["is_correct"].append
+    times_taken = columns["time_taken"].append
+    scores = columns["score_awarded"].append
+
+    for r in responses:
+        q_idx = r.get("question_index")
+        if isinstance(q_idx, int) and 0 <= q_idx < len(questions):
+            title, options, correct_text, start_time = questions[q_idx]
+        else:
+            title, options, correct_text, start_time = no_question
+        a_idx = r.get("answer_index")
+
+        time_taken = None
+        t1 = r.get("timestamp")
+        if start_time and t1:
+            try:
+                # Ensure t1 is offset-naive or aware matching start_time
+                if t1.tzinfo is None and start_time.tzinfo is not None:
+                    t1 = t1.replace(tzinfo=start_time.tzinfo)
+                time_taken = round((t1 - start_time).total_seconds(), 2)
+            except Exception as e:
+                print(f"Error calculating time: {e}")
+
+        player_names(players.get(r.get("sid"), "Unknown"))
+        question_indexes(q_idx + 1 if isinstance(q_idx, int) else None)
+        question_titles(title)
+        answers(options[a_idx] if isinstance(a_idx, int) and 0 <= a_idx < len(options) else str(a_idx))
+        correct_answers(correct_text)
+        is_correct(bool(r.get("is_correct")))
+        times_taken(time_taken)
+        scores(r.get("score_awarded", 0))
+    return columns
+
+def build_result_columns(session, responses):
+    """Returns the result columns for a single session."""
+    return append_result_columns(new_result_columns(), session, responses)
+
+def columns_to_csv(columns):
+    """Renders result columns in the single-room CSV layout used by /export/{room_id}."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADER)
+    writer.writerows(zip(
+        columns["player_name"],
+        columns["question_index"],
+        columns["question_title"],
+        columns["answer_selected"],
+        columns["correct_answer"],
+        ["Yes" if correct else "No" for correct in columns["is_correct"]],
+        ["N/A" if t is None else t for t in columns["time_taken"]],
+        columns["score_awarded"],
+    ))
+    return output.getvalue()
+
+def column_length(columns):
+    return len(columns["room_id"])
+
+async def iter_result_batches(quiz_id=None, start=None, end=None, session_batch_size=EXPORT_SESSION_BATCH_SIZE):
+    """Yields result columns for all sessions matching the filters, one dict per batch.
+
+    Sessions are read from a single cursor and their responses are fetched
+    with one query per batch of sessions instead of one per room.
+    """
+    pending = []
+    async for session in find_sessions(quiz_id=quiz_id, start=start, end=end, batch_size=session_batch_size):
+        pending.append(session)
+        if len(pending) >= session_batch_size:
+            yield await _columns_for_sessions(pending)
+            pending = []
+    if pending:
+        yield await _columns_for_sessions(pending)
+
+async def _columns_for_sessions(sessions):
+    responses = await get_responses_for_rooms([s["room_id"] for s in sessions])
+    columns = new_result_columns()
+    for session in sessions:
+        append_result_columns(columns, session, responses.get(session["room_id"], []))
+    return columns
+
+_encode_string = json.encoder.encode_basestring_ascii
+_NDJSON_ROW = "{" + ",".join(f'"{name}":%s' for name in EXPORT_COLUMNS) + "}\n"
+
+def _json_value(value):
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if type(value) is int or type(value) is float:
+        return repr(value)
+    return json.dumps(value, default=str)
+
+def _json_column(values):
+    # Encode column by column so each row is one string format, not a dict + dumps
+    return [_encode_string(v) if type(v) is str else _json_value(v) for v in values]
+
+async def stream_ndjson(batches):
+    async for columns in batches:
+        if column_length(columns):
+            encoded = [_json_column(columns[name]) for name in EXPORT_COLUMNS]
+            yield "".join([_NDJSON_ROW % values for values in zip(*encoded)])
+
+def _arrow_schema():
+    return pa.schema([
+        ("room_id", pa.string()),
+        ("quiz_id", pa.string()),
+        ("session_created_at", pa.timestamp("ms")),
+        ("player_name", pa.string()),
+        ("question_index", pa.int32()),
+        ("question_title", pa.string()),
+        ("answer_selected", pa.string()),
+        ("correct_answer", pa.string()),
+        ("is_correct", pa.bool_()),
+        ("time_taken", pa.float64()),
+        ("score_awarded", pa.int64()),
+    ])
+
+def _timestamps(values):
+    # Creation times repeat for every response in a session, so parse each once
+    parsed = {v: datetime.fromisoformat(v) for v in set(values) if v is not None}
+    return [parsed.get(v) for v in values]
+
+def _record_batch(columns, schema):
+    arrays = []
+    for field in schema:
+        values = columns[field.name]
+        if field.name == "session_created_at":
+            values = _timestamps(values)
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller.
+
+    Keeps a running position so pyarrow writers can compute footer offsets
+    while the buffered bytes are drained between batches.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+async def _stream_columnar(batches, open_writer):
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = open_writer(pa.PythonFile(sink, mode="w"), schema)
+    async for columns in batches:
+        if column_length(columns):
+            writer.write_batch(_record_batch(columns, schema))
+            data = sink.drain()
+            if data:
+                yield data
+    writer.close()
+    yield sink.drain()
+
+def stream_parquet(batches):
+    return _stream_columnar(batches, lambda sink, schema: pq.ParquetWriter(sink, schema))
+
+def stream_arrow(batches):
+    return _stream_columnar(batches, lambda sink, schema: pa.ipc.new_stream(sink, schema))
+
+def columnar_available():
+    return pa is not None
@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# Low levels keep multi-MB list bodies cheap to compress; br at its default
+# quality 11 takes seconds per MB
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+
+# Compressed bodies keyed by (etag, encoding); quizzes don't change once created
+_COMPRESSED_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_compressed_cache = OrderedDict()
+_compressed_cache_bytes = 0
+
+def combine_etags(etags):
+    """Builds one ETag for a list response from the ETags of its items."""
+    digest = hashlib.sha256("".join(etags).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+def _encoded_etag(etag: str, encoding):
+    """Gives each content-coding of a body its own ETag, e.g. "abc" -> "abc-gzip"."""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+def _matching_etag(request: Request, etag: str):
+    """Returns the If-None-Match entry that covers etag in any encoding, or None."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    variants = {etag} | {_encoded_etag(etag, encoding) for encoding in ("gzip", "br")}
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") in variants:
+            return candidate
+    return None
+
+def etag_matches(request: Request, etag: str):
+    """True when the request's If-None-Match header covers etag."""
+    return _matching_etag(request, etag) is not None
+
+def _accepted_encodings(header: str):
+    """Parses Accept-Encoding into {coding: q}."""
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+def _pick_encoding(request: Request):
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    best, best_q = None, 0.0
+    for encoding in ("br", "gzip"):  # Preferred first on equal q
+        if encoding == "br" and brotli is None:
+            continue
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def _compress(body: bytes, encoding: str):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+async def _compressed(body: bytes, etag: str, encoding: str):
+    """Compresses off the event loop, caching results up to a byte budget."""
+    global _compressed_cache_bytes
+    key = (etag, encoding)
+    if key in _compressed_cache:
+        _compressed_cache.move_to_end(key)
+        return _compressed_cache[key]
+
+    compressed = await run_in_threadpool(_compress, body, encoding)
+    if key not in _compressed_cache and len(compressed) <= _COMPRESSED_CACHE_MAX_BYTES:
+        _compressed_cache[key] = compressed
+        _compressed_cache_bytes += len(compressed)
+        while _compressed_cache_bytes > _COMPRESSED_CACHE_MAX_BYTES:
+            _, evicted = _compressed_cache.popitem(last=False)
+            _compressed_cache_bytes -= len(evicted)
+    return compressed
+
+async def cached_json_response(request: Request, body: str, etag: str, cache_control: str):
+    """Serves a pre-serialized JSON body with ETag validation and compression."""
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    matched = _matching_etag(request, etag)
+    if matched:
+        # Confirm the validator the client already holds
+        headers["ETag"] = etag if matched == "*" else matched
+        return Response(status_code=304, headers=headers)
+
+    content = body.encode("utf-8")
+    encoding = _pick_encoding(request) if len(content) >= MIN_COMPRESS_SIZE else None
+    if encoding:
+        content = await _compressed(content, etag, encoding)
+        headers["Content-Encoding"] = encoding
+    headers["ETag"] = _encoded_etag(etag, encoding)
+    return Response(content=content, media_type="application/json", headers=headers)
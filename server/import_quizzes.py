@@ -0,0 +1,43 @@
+"""Bulk-imports quizzes into MongoDB from an NDJSON file or JSON array.
+
+Usage: python import_quizzes.py [path] [--batch-size N]
+Reads stdin when no path (or "-") is given.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from database import close_mongodb_connection
+from importer import IMPORT_BATCH_SIZE, import_quizzes
+
+CHUNK_SIZE = 64 * 1024
+
+async def read_chunks(stream):
+    while True:
+        chunk = await asyncio.to_thread(stream.read, CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bulk-import quizzes into MongoDB")
+    parser.add_argument("path", nargs="?", default="-", help="NDJSON or JSON array file (default: stdin)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        summary = await import_quizzes(read_chunks(stream), batch_size=args.batch_size)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+        await close_mongodb_connection()
+
+    for error in summary["errors"]:
+        print(json.dumps(error), file=sys.stderr)
+    print(f"Received {summary['received']}, inserted {summary['inserted']}, failed {summary['failed']}")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
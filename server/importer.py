@@ -0,0 +1,213 @@
+import codecs
+import json
+import re
+
+from pydantic import ValidationError
+
+from models import QuizCreate
+from database import create_quizzes
+
+IMPORT_BATCH_SIZE = 500
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_BOM = codecs.BOM_UTF8
+
+async def iter_json_records(chunks):
+    """Yields (index, record or None, error or None) from a stream of bytes.
+
+    Accepts either NDJSON (one quiz per line) or a single JSON array of
+    quizzes, optionally UTF-8 BOM prefixed, and parses records as data
+    arrives instead of loading the whole body. A malformed NDJSON line
+    (bad JSON or invalid UTF-8) only fails that record; a malformed array
+    ends the stream since the remaining element boundaries are unknown.
+    Errors that don't belong to a record (a missing ',' or ']', data after
+    the array) are yielded with an index of None.
+    """
+    chunks = chunks.__aiter__()
+    head = b""
+    finished = False
+    while True:
+        try:
+            head += await chunks.__anext__()
+        except StopAsyncIteration:
+            finished = True
+        if finished or len(head) >= len(_BOM):
+            break
+    if head.startswith(_BOM):
+        head = head[len(_BOM):]
+
+    # Skip leading whitespace to see whether the body is an array
+    while not head.lstrip() and not finished:
+        try:
+            head += await chunks.__anext__()
+        except StopAsyncIteration:
+            finished = True
+    head = head.lstrip()
+    if not head:
+        return
+
+    is_array = head.startswith(b"[")
+    if is_array:
+        head = head[1:]
+
+    async def rest():
+        yield head
+        if not finished:
+            async for chunk in chunks:
+                yield chunk
+
+    records = _iter_array_records(rest()) if is_array else _iter_ndjson_records(rest())
+    async for record in records:
+        yield record
+
+async def _iter_ndjson_records(chunks):
+    buffer = b""
+    index = 0
+
+    def parse(line):
+        try:
+            return json.loads(line.decode("utf-8")), None
+        except UnicodeDecodeError as e:
+            return None, f"Invalid UTF-8: {e}"
+        except json.JSONDecodeError as e:
+            return None, f"Invalid JSON: {e}"
+
+    async for chunk in chunks:
+        scan = len(buffer)
+        buffer += chunk
+        start = 0
+        while True:
+            newline = buffer.find(b"\n", scan)
+            if newline < 0:
+                break
+            line = buffer[start:newline].strip()
+            start = scan = newline + 1
+            if line:
+                record, error = parse(line)
+                yield index, record, error
+                index += 1
+        buffer = buffer[start:]
+
+    line = buffer.strip()
+    if line:
+        record, error = parse(line)
+        yield index, record, error
+
+async def _iter_array_records(chunks):
+    buffer = ""  # Starts after the opening '['
+    pos = 0
+    index = 0
+    finished = False
+    expect_value = True  # Next token is an element, else ',' or ']'
+    pending = b""  # Undecoded bytes: a split character, or the invalid tail
+    decode_error = None
+    chunks = chunks.__aiter__()
+
+    while True:
+        try:
+            data = pending + await chunks.__anext__()
+        except StopAsyncIteration:
+            finished = True
+            data = pending
+        try:
+            text = data.decode("utf-8")
+            pending = b""
+        except UnicodeDecodeError as e:
+            # Parse the valid prefix first so the error lands on the right record
+            text = data[:e.start].decode("utf-8")
+            pending = data[e.start:]
+            if finished or e.reason != "unexpected end of data":
+                decode_error = f"Invalid UTF-8: {e}"
+        # Trim consumed input once per chunk rather than once per element
+        buffer = buffer[pos:] + text
+        pos = 0
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if char == "]" and (not expect_value or index == 0):
+                if buffer[pos + 1:].strip(" \t\r\n") or not await _only_whitespace_left(chunks, pending):
+                    yield None, None, "Unexpected data after JSON array"
+                return
+            if not expect_value:
+                if char != ",":
+                    yield None, None, f"Expected ',' or ']' after element {index - 1}"
+                    return
+                pos += 1
+                expect_value = True
+                continue
+            try:
+                record, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if not finished and not decode_error:
+                    break  # Element is incomplete, wait for more data
+                yield index, None, decode_error or f"Invalid JSON: {e}"
+                return
+            if end == len(buffer) and not finished and not decode_error:
+                break  # A scalar may continue in the next chunk
+            pos = end
+            expect_value = False
+            yield index, record, None
+            index += 1
+
+        if decode_error:
+            yield (index if expect_value else None), None, decode_error
+            return
+        if finished:
+            yield None, None, "Unterminated JSON array"
+            return
+
+async def _only_whitespace_left(chunks, pending):
+    """Drains the stream after the closing ']', checking nothing else follows."""
+    async for chunk in chunks:
+        pending += chunk
+        if pending.strip(b" \t\r\n"):
+            return False
+        pending = b""
+    return not pending.strip(b" \t\r\n")
+
+def _validation_errors(e: ValidationError):
+    return [
+        {"loc": ".".join(str(part) for part in err["loc"]), "msg": err["msg"]}
+        for err in e.errors()
+    ]
+
+async def import_quizzes(chunks, batch_size=IMPORT_BATCH_SIZE):
+    """Validates and inserts quizzes from a byte stream in batches.
+
+    Returns a summary with the per-record errors; invalid or rejected records
+    are skipped without aborting the import. Stream-level errors are listed
+    with an index of None and aren't counted as received or failed records.
+    """
+    summary = {"received": 0, "inserted": 0, "errors": []}
+    batch = []  # (index, quiz document)
+
+    async def flush():
+        inserted, write_errors = await create_quizzes([doc for _, doc in batch])
+        summary["inserted"] += inserted
+        for position, message in write_errors.items():
+            summary["errors"].append({"index": batch[position][0], "errors": [{"loc": "", "msg": message}]})
+        batch.clear()
+
+    async for index, record, error in iter_json_records(chunks):
+        if index is not None:
+            summary["received"] += 1
+        if error:
+            summary["errors"].append({"index": index, "errors": [{"loc": "", "msg": error}]})
+            continue
+        try:
+            quiz = QuizCreate.model_validate(record)
+        except ValidationError as e:
+            summary["errors"].append({"index": index, "errors": _validation_errors(e)})
+            continue
+        batch.append((index, quiz.model_dump()))
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+    summary["failed"] = sum(1 for error in summary["errors"] if error["index"] is not None)
+    return summary
@@ -1,18 +1,30 @@
-from fastapi import FastAPI, Response, Body, HTTPException
+from fastapi import FastAPI, Request, Response, Body, HTTPException
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
-import csv
-import io
 from datetime import datetime
+from typing import Optional
 import asyncio
 import os
 from dotenv import load_dotenv
 
 from models import QuizCreate, Quiz
 from quiz_manager import quiz_manager
+from importer import import_quizzes
+from http_cache import cached_json_response, combine_etags, etag_matches
+from exports import (
+    BULK_FORMATS,
+    build_result_columns,
+    columnar_available,
+    columns_to_csv,
+    iter_result_batches,
+    stream_arrow,
+    stream_ndjson,
+    stream_parquet
+)
 from database import (
     connect_to_mongodb,
+    ensure_indexes,
     create_game_session,
     add_player_to_session,
     save_response,
@@ -20,8 +32,11 @@ from database import (
     log_question_start_time,
     get_session_data,
     create_quiz,
-    get_quizzes,
     get_quiz,
+    get_quiz_body,
+    get_quiz_etag,
+    get_quiz_bodies,
+    get_quiz_etags,
     get_room_responses
 )
 
@@ -53,25 +68,50 @@ async def root():
 
 # --- REST API Endpoints ---
 
+# Quiz bodies include the answer key and quizzes can be deleted, so shared
+# caches must not store them and clients revalidate via ETag on every read
+QUIZ_CACHE_CONTROL = "private, no-cache"
+
 @app.get("/api/quizzes")
-async def list_quizzes():
-    return await get_quizzes()
+async def list_quizzes(request: Request):
+    # Check the combined ETag before loading any quiz bodies
+    etag = combine_etags(await get_quiz_etags())
+    if etag_matches(request, etag):
+        return await cached_json_response(request, "", etag, QUIZ_CACHE_CONTROL)
+
+    quizzes = await get_quiz_bodies()
+    body = "[" + ",".join(serialized for _, serialized in quizzes) + "]"
+    etag = combine_etags([quiz_etag for quiz_etag, _ in quizzes])
+    return await cached_json_response(request, body, etag, QUIZ_CACHE_CONTROL)
 
 @app.post("/api/quizzes")
 async def create_new_quiz(quiz: QuizCreate):
     quiz_id = await create_quiz(quiz.dict())
     return {"id": quiz_id, "message": "Quiz created successfully"}
 
+@app.post("/api/quizzes/bulk")
+async def bulk_import_quizzes(request: Request):
+    """Imports quizzes from an NDJSON or JSON array body, reporting per-record errors."""
+    return await import_quizzes(request.stream())
+
 @app.get("/api/quizzes/{quiz_id}")
-async def get_quiz_details(quiz_id: str):
-    quiz = await get_quiz(quiz_id)
-    if not quiz:
+async def get_quiz_details(quiz_id: str, request: Request):
+    # Check the ETag before loading the quiz body
+    etag = await get_quiz_etag(quiz_id)
+    if not etag:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return quiz
+    if etag_matches(request, etag):
+        return await cached_json_response(request, "", etag, QUIZ_CACHE_CONTROL)
+
+    etag, body = await get_quiz_body(quiz_id)
+    if not etag:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return await cached_json_response(request, body, etag, QUIZ_CACHE_CONTROL)
 
 # --- Export Logic ---
 
-@app.get("/exports/{room_id}")  # Changed to plural to match typical convention, or keep singular
+@app.get("/export/{room_id}")
+@app.get("/exports/{room_id}")  # Plural alias kept for existing links
 async def export_results(room_id: str):
     session = await get_session_data(room_id)
     if not session:
@@ -84,77 +124,50 @@ async def export_results(room_id: str):
         print(f"Error fetching responses: {e}")
         responses = []
 
-    # Prepare CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow(["Player Name", "Question Index", "Question Title", "Answer Selected", "Correct Answer", "Is Correct", "Time Taken (s)", "Score Awarded"])
-    
-    quiz_data = session.get("quiz_data", {})
-    questions = quiz_data.get("questions", [])
-    players = {p["sid"]: p for p in session.get("players", [])}
-    start_times = session.get("question_start_times", {})
-    
-    for r in responses:
-        sid = r.get("sid")
-        player = players.get(sid, {"name": "Unknown"})
-        q_idx = r.get("question_index")
-        a_idx = r.get("answer_index")
-        
-        question = questions[q_idx] if q_idx < len(questions) else {}
-        q_title = question.get("title", "")
-        options = question.get("options", [])
-        correct_opt = question.get("correctOption")
-        
-        answer_text = options[a_idx] if a_idx < len(options) else str(a_idx)
-        correct_text = options[correct_opt] if correct_opt < len(options) else str(correct_opt)
-        
-        # Calculate time taken
-        time_taken = "N/A"
-        start_time = start_times.get(str(q_idx)) 
-        
-        # Handle start_time if it's a string (from JSON serialization) or datetime
-        if start_time and isinstance(start_time, str):
-            try:
-                start_time = datetime.fromisoformat(start_time)
-            except:
-                pass
-
-        if start_time and r.get("timestamp"):
-            try:
-                t1 = r.get("timestamp")
-                # Ensure t1 is offset-naive or aware matching start_time
-                if t1.tzinfo is None and start_time.tzinfo is not None:
-                     t1 = t1.replace(tzinfo=start_time.tzinfo) 
-                
-                delta = t1 - start_time
-                time_taken = round(delta.total_seconds(), 2)
-            except Exception as e:
-                print(f"Error calculating time: {e}")
-                
-        writer.writerow([
-            player.get("name"),
-            q_idx + 1,
-            q_title,
-            answer_text,
-            correct_text,
-            "Yes" if r.get("is_correct") else "No",
-            time_taken,
-            r.get("score_awarded", 0)
-        ])
-
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        iter([columns_to_csv(build_result_columns(session, responses))]),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=results_{room_id}.csv"}
     )
+
+@app.get("/exports")
+async def bulk_export_results(
+    format: str = "ndjson",
+    quiz_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Streams results for every session of a quiz and/or date range."""
+    if format not in BULK_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if not (quiz_id or start or end):
+        raise HTTPException(status_code=400, detail="Provide quiz_id or a start/end date range")
+    if format != "ndjson" and not columnar_available():
+        raise HTTPException(status_code=501, detail="pyarrow is required for Parquet/Arrow exports")
+
+    batches = iter_result_batches(quiz_id=quiz_id, start=start, end=end)
+    if format == "parquet":
+        body = stream_parquet(batches)
+    elif format == "arrow":
+        body = stream_arrow(batches)
+    else:
+        body = stream_ndjson(batches)
+
+    media_type, extension = BULK_FORMATS[format]
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=results.{extension}"}
+    )
     
 
 @app.on_event("startup")
 async def startup_db_client():
-    await connect_to_mongodb()
+    if await connect_to_mongodb():
+        try:
+            await ensure_indexes()
+        except Exception as e:
+            print(f"Index creation failed: {e}")
 
 # --- Socket.IO Events ---
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
@@ -24,6 +24,12 @@ class Question(BaseModel):
     correctOption: int
     timeLimit: int = 20
 
+    @model_validator(mode="after")
+    def check_correct_option(self):
+        if not 0 <= self.correctOption < len(self.options):
+            raise ValueError("correctOption must be the index of one of the options")
+        return self
+
 class QuizBase(BaseModel):
     title: str
     questions: List[Question]
@@ -0,0 +1,117 @@
+import asyncio
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+import exports
+import main
+from bench_export import baseline_csv, make_session
+
+async def _batches(*sessions):
+    for session, responses in sessions:
+        yield exports.build_result_columns(session, responses)
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+def _edge_session():
+    session, responses = make_session(1)
+    # ISO string start time, missing start time, unknown player
+    session["question_start_times"]["0"] = session["question_start_times"]["0"].isoformat()
+    del session["question_start_times"]["1"]
+    responses[0]["sid"] = "gone"
+    return session, responses
+
+@pytest.mark.parametrize("session, responses", [make_session(0), _edge_session()])
+def test_csv_matches_original_export(session, responses):
+    assert exports.columns_to_csv(exports.build_result_columns(session, responses)) == baseline_csv(session, responses)
+
+def test_columns_are_denormalized():
+    session, responses = _edge_session()
+    columns = exports.build_result_columns(session, responses[:2] + responses[-1:])
+    assert columns["room_id"] == ["000001"] * 3
+    assert columns["session_created_at"] == [session["created_at"].isoformat()] * 3
+    assert columns["player_name"] == ["Unknown", "Player 1", "Player 29"]
+    assert columns["question_index"] == [1, 1, 20]
+    assert columns["question_title"] == ["Question 0", "Question 0", "Question 19"]
+    assert columns["correct_answer"] == ["A", "A", "D"]
+    assert columns["time_taken"] == [0.0, 1.0, 9.0]
+
+def test_ndjson_lines_match_columns():
+    data = [make_session(0), _edge_session()]
+    body = "".join(asyncio.run(_collect(exports.stream_ndjson(_batches(*data)))))
+    lines = [json.loads(line) for line in body.splitlines()]
+    expected = []
+    for session, responses in data:
+        columns = exports.build_result_columns(session, responses)
+        expected += [dict(zip(exports.EXPORT_COLUMNS, row)) for row in zip(*columns.values())]
+    assert lines == expected
+
+def test_ndjson_empty():
+    assert asyncio.run(_collect(exports.stream_ndjson(_batches()))) == []
+
+@pytest.mark.parametrize("data", [[make_session(0), make_session(1)], []])
+def test_columnar_round_trip(data):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = 600 * len(data)
+
+    parquet = b"".join(asyncio.run(_collect(exports.stream_parquet(_batches(*data)))))
+    table = pq.read_table(io.BytesIO(parquet))
+    assert table.num_rows == rows
+    assert table.column_names == exports.EXPORT_COLUMNS
+
+    arrow = b"".join(asyncio.run(_collect(exports.stream_arrow(_batches(*data)))))
+    table = pa.ipc.open_stream(arrow).read_all()
+    assert table.num_rows == rows
+    if data:
+        first = table.slice(0, 1).to_pylist()[0]
+        assert first["session_created_at"] == data[0][0]["created_at"]
+        assert first["player_name"] == "Player 0"
+
+class _FakeCursor:
+    def sort(self, *args):
+        self.sorted_by = args
+        return self
+
+    def batch_size(self, size):
+        self.size = size
+        return self
+
+class _FakeCollection:
+    def find(self, query):
+        self.query = query
+        self.cursor = _FakeCursor()
+        return self.cursor
+
+@pytest.mark.parametrize("kwargs, query", [
+    ({"quiz_id": "q1"}, {"quiz_data.id": "q1"}),
+    ({"start": datetime(2024, 1, 1)}, {"created_at": {"$gte": datetime(2024, 1, 1)}}),
+    ({"quiz_id": "q1", "start": datetime(2024, 1, 1), "end": datetime(2024, 2, 1)},
+     {"quiz_data.id": "q1", "created_at": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 2, 1)}}),
+])
+def test_find_sessions_query(monkeypatch, kwargs, query):
+    collection = _FakeCollection()
+    monkeypatch.setattr(database, "sessions_collection", collection)
+    database.find_sessions(batch_size=50, **kwargs)
+    assert collection.query == query
+    assert collection.cursor.sorted_by == ("created_at", 1)
+    assert collection.cursor.size == 50
+
+@pytest.mark.parametrize("params, status", [
+    ({"quiz_id": "q1", "format": "csv"}, 400),
+    ({}, 400),
+    ({"format": "parquet"}, 400),
+])
+def test_bulk_export_rejects_bad_requests(params, status):
+    assert TestClient(main.app).get("/exports", params=params).status_code == status
+
+def test_bulk_export_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(main, "columnar_available", lambda: False)
+    client = TestClient(main.app)
+    assert client.get("/exports", params={"quiz_id": "q1", "format": "arrow"}).status_code == 501
+    assert client.get("/exports", params={"quiz_id": "q1", "format": "parquet"}).status_code == 501
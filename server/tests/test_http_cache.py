@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+import http_cache
+import main
+
+ETAG = '"abc123"'
+
+def _request(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    (ETAG, True),
+    (f'"other", {ETAG}', True),
+    (f"W/{ETAG}", True),
+    ('"abc123-gzip"', True),
+    ('W/"abc123-br"', True),
+    ('"abc123-deflate"', False),
+    ("*", True),
+    ('"other"', False),
+    ('"abc12"', False),
+])
+def test_etag_matches(header, expected):
+    request = _request(if_none_match=header) if header else _request()
+    assert http_cache.etag_matches(request, ETAG) is expected
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", object())
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", None)
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip, deflate, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("gzip, br; q=0", "gzip"),
+    ("gzip, br;q=0.0", "gzip"),
+    ("gzip; q=0, br", "br"),
+    ("gzip;q=0, br;q=0", None),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=bogus", None),
+    ("GZIP", "gzip"),
+])
+def test_pick_encoding(with_brotli, header, expected):
+    assert http_cache._pick_encoding(_request(accept_encoding=header)) == expected
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "gzip"),
+    ("br", None),
+    ("*", "gzip"),
+])
+def test_pick_encoding_without_brotli(without_brotli, header, expected):
+    assert http_cache._pick_encoding(_request(accept_encoding=header)) == expected
+
+BODY = '{"title": "' + "x" * 2000 + '"}'
+
+def _respond(body=BODY, **headers):
+    return asyncio.run(http_cache.cached_json_response(_request(**headers), body, ETAG, "private, no-cache"))
+
+def test_each_encoding_has_its_own_etag(without_brotli):
+    identity = _respond(accept_encoding="identity")
+    gzipped = _respond(accept_encoding="gzip")
+    assert identity.headers["etag"] == ETAG
+    assert gzipped.headers["etag"] == '"abc123-gzip"'
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert _respond(body="{}", accept_encoding="gzip").headers["etag"] == ETAG
+
+def test_not_modified_echoes_the_matched_etag():
+    response = _respond(accept_encoding="gzip", if_none_match='"abc123-gzip"')
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"abc123-gzip"'
+    assert response.body == b""
+
+def test_quiz_not_modified_skips_the_body(monkeypatch):
+    async def get_quiz_etag(quiz_id):
+        return ETAG
+
+    async def get_quiz_body(quiz_id):
+        raise AssertionError("body loaded for a matching If-None-Match")
+
+    monkeypatch.setattr(main, "get_quiz_etag", get_quiz_etag)
+    monkeypatch.setattr(main, "get_quiz_body", get_quiz_body)
+    response = TestClient(main.app).get("/api/quizzes/q1", headers={"If-None-Match": ETAG})
+    assert response.status_code == 304
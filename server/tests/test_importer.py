@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+
+import pytest
+from pydantic import ValidationError
+
+import importer
+from models import Question
+
+QUIZ = {"title": "Café", "questions": [{"title": "Q", "options": ["a", "b"], "correctOption": 1}]}
+
+async def _chunks(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+def _records(data, size=None):
+    async def collect():
+        return [r async for r in importer.iter_json_records(_chunks(data, size or len(data) or 1))]
+    return asyncio.run(collect())
+
+def _import(data, batch_size=2, write_errors=None):
+    inserted = []
+
+    async def fake_create_quizzes(docs):
+        inserted.append(list(docs))
+        errors = (write_errors or {}).get(len(inserted) - 1, {})
+        return len(docs) - len(errors), errors
+
+    original = importer.create_quizzes
+    importer.create_quizzes = fake_create_quizzes
+    try:
+        summary = asyncio.run(importer.import_quizzes(_chunks(data, 7), batch_size=batch_size))
+    finally:
+        importer.create_quizzes = original
+    return summary, inserted
+
+@pytest.mark.parametrize("data", [
+    json.dumps([QUIZ, 12, 345, "x", QUIZ], ensure_ascii=False).encode(),
+    (json.dumps(QUIZ, ensure_ascii=False) + "\n12\n345\n\"x\"\n" + json.dumps(QUIZ)).encode(),
+])
+def test_records_survive_every_chunk_boundary(data):
+    expected = [(0, QUIZ, None), (1, 12, None), (2, 345, None), (3, "x", None), (4, QUIZ, None)]
+    for size in range(1, len(data) + 1):
+        assert _records(data, size) == expected, size
+
+def test_bad_ndjson_line_only_fails_that_record():
+    records = _records(b'{"a": 1}\n{bad\n\n{"b": 2}\n', 3)
+    assert [(i, r) for i, r, _ in records] == [(0, {"a": 1}), (1, None), (2, {"b": 2})]
+    assert records[1][2].startswith("Invalid JSON")
+
+@pytest.mark.parametrize("data, message", [
+    (b"[1, 2 3]", "Expected ',' or ']'"),
+    (b"[1, 2] garbage", "Unexpected data after JSON array"),
+    (b"[1, 2", "Unterminated JSON array"),
+])
+def test_malformed_array_reports_stream_error(data, message):
+    for size in range(1, len(data) + 1):
+        records = _records(data, size)
+        assert records[:2] == [(0, 1, None), (1, 2, None)]
+        assert records[2][0] is None and records[2][2].startswith(message)
+
+def test_invalid_array_element_ends_stream():
+    records = _records(b'[{"a": 1}, {bad}, {"b": 2}]', 4)
+    assert records[0] == (0, {"a": 1}, None)
+    assert records[1][0] == 1 and records[1][2].startswith("Invalid JSON")
+    assert len(records) == 2
+
+def test_empty_array_and_trailing_whitespace():
+    assert _records(b" [ ] \n", 1) == []
+
+def test_question_rejects_correct_option_outside_options():
+    Question(title="Q", options=["a", "b"], correctOption=1)
+    for correct in (2, -1):
+        with pytest.raises(ValidationError, match="correctOption"):
+            Question(title="Q", options=["a", "b"], correctOption=correct)
+
+def test_import_reports_errors_per_record_and_batches_inserts():
+    bad_option = {"title": "t", "questions": [{"title": "Q", "options": ["a"], "correctOption": 3}]}
+    data = json.dumps([QUIZ, bad_option, QUIZ, {"title": 1}, QUIZ, QUIZ]).encode()
+    summary, inserted = _import(data, write_errors={1: {0: "duplicate key"}})
+
+    assert [len(batch) for batch in inserted] == [2, 2]
+    assert summary["received"] == 6
+    assert summary["inserted"] == 3
+    assert summary["failed"] == 3
+    errors = {e["index"]: e["errors"] for e in summary["errors"]}
+    assert errors[1][0]["loc"] == "questions.0"
+    assert "correctOption" in errors[1][0]["msg"]
+    assert 3 in errors
+    assert errors[4] == [{"loc": "", "msg": "duplicate key"}]
+
+def test_import_stream_error_is_not_a_record():
+    summary, _ = _import(json.dumps([QUIZ]).encode()[:-1])
+    assert summary["received"] == 1
+    assert summary["inserted"] == 1
+    assert summary["failed"] == 0
+    assert summary["errors"] == [{"index": None, "errors": [{"loc": "", "msg": "Unterminated JSON array"}]}]
+
+@pytest.mark.parametrize("body", [
+    json.dumps([QUIZ, QUIZ], indent=2, ensure_ascii=False),
+    json.dumps(QUIZ, ensure_ascii=False) + "\n" + json.dumps(QUIZ, ensure_ascii=False),
+])
+def test_utf8_bom_is_stripped(body):
+    data = b"\xef\xbb\xbf" + body.encode()
+    for size in (1, 2, 3, 4, len(data)):
+        assert _records(data, size) == [(0, QUIZ, None), (1, QUIZ, None)]
+
+def test_invalid_utf8_ndjson_line_only_fails_that_record():
+    records = _records(b'{"title": "Caf\xe9"}\n{"a": 1}\n', 4)
+    assert records[0][0] == 0 and records[0][2].startswith("Invalid UTF-8")
+    assert records[1] == (1, {"a": 1}, None)
+
+def test_invalid_utf8_in_array_fails_the_record():
+    for size in (1, 5, 100):
+        records = _records(b'[{"a": 1}, {"title": "Caf\xe9"}, {"b": 2}]', size)
+        assert records[0] == (0, {"a": 1}, None)
+        assert records[1][0] == 1 and records[1][2].startswith("Invalid UTF-8")
+        assert len(records) == 2
+
+def test_single_large_chunk_is_linear():
+    data = json.dumps([QUIZ] * 20000).encode()
+    started = time.perf_counter()
+    assert len(_records(data)) == 20000
+    assert time.perf_counter() - started < 2